@@ -1,4 +1,8 @@
+import os
+import sys
+
 from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from implib import arguments
@@ -32,14 +36,23 @@ def munki_kwargs(args: Namespace, pkg: package.AdobePackage, munki_repo: Path) -
     return result
 
 
+def gather_package(args: Namespace, files: dict, opt_values: dict,
+                   munkiimport_prefs: MunkiImportPreferences) -> package.AdobePackage:
+    """Return the processed AdobePackage for the installer/uninstaller files discovered for an app"""
+    return package.process_package(files["installer"], files["uninstaller"],
+                                   munkiimport_prefs, args.locale, files.get("dmg_file"),
+                                   use_cache=not args.no_cache, opt_values=opt_values)
+
+
 def process():
     args = arguments.construct()
     munkiimport_prefs = MunkiImportPreferences()
 
     munki_repo = args.munki_repo or munkiimport_prefs.repo_url
-    existing_pkgs = pkginfo.existing_pkginfo(munkiimport_prefs)
+    existing_pkgs = {f.name for f in pkginfo.existing_pkginfo(munkiimport_prefs)}
     packages = discover.adobe_packages(Path(args.adobe_dir).resolve())
     imported = list()
+    icon_jobs = list()
     status_message = "Gathering Adobe installer attributes from packages ..."
 
     if args.dry_run:
@@ -47,35 +60,81 @@ def process():
 
     print(status_message)
 
-    for app, files in packages.items():
-        pkg = package.process_package(files["installer"], files["uninstaller"],
-                                      munkiimport_prefs, args.locale, files.get("dmg_file"))
-        pkg.imported = any([pkg.pkginfo_file in str(f) for f in existing_pkgs])
+    # Only the optionXML.xml values are needed to skip packages that weren't asked for or are already
+    # imported, so check those before gathering everything else
+    to_process = list()
+
+    for files in packages.values():
+        try:
+            light = package.process_package_light(files["installer"], munkiimport_prefs)
+        except package.UnsupportedMediaException as e:
+            print(f"Skipping {str(files['installer'])!r}, {e}", file=sys.stderr)
+            continue
+
+        if light["sap_code"] not in args.import_sap_code:
+            continue
+
+        if light["pkginfo_file"] in existing_pkgs:
+            print(f"Skipping {light['pkg_name']!r}, existing pkginfo: {light['pkginfo_file']!r}")
+            continue
+
+        to_process.append((files, light))
+
+    # Gathering attributes is mostly waiting on disk I/O (and mounting/expanding for Acrobat), so
+    # process packages concurrently. The number of workers is kept low as concurrent DMG mounts
+    # contend with each other.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        processed = list(executor.map(lambda job: gather_package(args, *job, munkiimport_prefs), to_process))
+
+    import_jobs = list()
+    errors = list()
+
+    for pkg in processed:
+        # Acrobat's pkginfo file is only known once its DMG is processed, everything else was checked above
+        pkg.imported = pkg.sap_code == "APRO" and pkg.pkginfo_file in existing_pkgs
 
         if args.min_os_ver:
             pkg.min_os = args.min_os_ver
 
-        if not pkg.imported and pkg.sap_code in args.import_sap_code:
-            munkiimport_args = munki_kwargs(args, pkg, munki_repo)
-            pkginfo_file = munkiimport.package(pkg, dry_run=args.dry_run, **munkiimport_args)
+        if not pkg.imported:
+            import_jobs.append((pkg, munki_kwargs(args, pkg, munki_repo)))
+        else:
+            print(f"Skipping {pkg.pkg_name!r}, existing pkginfo: {pkg.pkginfo_file!r}")
 
-            if pkg.receipts:
-                pkginfo.update(pkginfo_file, args.dry_run, pkg.receipts)
+    # A failed import is reported and the remaining packages are still imported
+    for pkg, pkginfo_file, error in munkiimport.package_many(import_jobs, dry_run=args.dry_run):
+        if error:
+            print(f"Failed importing {pkg.pkg_name!r}: {error}", file=sys.stderr)
+            errors.append(error)
+            continue
 
-            if pkginfo_file:
-                imported.append(pkginfo_file)
+        if pkg.receipts:
+            pkginfo.update(pkginfo_file, args.dry_run, pkg.receipts)
 
-            if pkg.app_icon and pkg.icon:
-                copy_icon(pkg.app_icon, pkg.icon, args.dry_run)
-            else:
-                print(f"  > No icon found for {pkg.pkg_name!r}")
+        if pkginfo_file:
+            imported.append(pkginfo_file)
+
+        if pkg.app_icon and pkg.icon:
+            icon_jobs.append((pkg.app_icon, pkg.icon))
         else:
-            if pkg.sap_code in args.import_sap_code:
-                print(f"Skipping {pkg.pkg_name!r}, existing pkginfo: {pkg.pkginfo_file!r}")
+            print(f"  > No icon found for {pkg.pkg_name!r}")
+
+    # Icon copies/conversions are independent of each other, so run these concurrently, a dry run only
+    # prints so keep that serial for stable output
+    if icon_jobs and args.dry_run:
+        for job in icon_jobs:
+            copy_icon(*job, args.dry_run, use_cache=not args.no_cache)
+    elif icon_jobs:
+        with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4)) as executor:
+            list(executor.map(lambda job: copy_icon(*job, args.dry_run, use_cache=not args.no_cache), icon_jobs))
 
     if imported and not args.dry_run:
         munkiimport.makecatalogs(munki_repo)
 
+    # Packages that did import have had catalogs made, each failure has already been reported
+    if errors:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     process()
@@ -1,14 +1,23 @@
 """Handling the Acrobat package"""
+import hashlib
+import json
+import os
 import shutil
+import sys
 
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Union
+from tempfile import mkdtemp, mkstemp
+from typing import Any, Dict, List, Union
 
 from .pkgutil import expand_package
-from .xmltodict import convert_xml, read_xml
+from .xmltodict import convert_xml_iter
 from . import dmg
 
 
+# Cache of values pulled from previously processed Acrobat DMG files.
+ACROBAT_CACHE_DIR = Path("~/.cache/adobe-mun-kinobi/acrobat").expanduser()
+
 # Used only for pulling the version to use.
 ACROBAT_APP_VER_ATTR = "com.adobe.acrobat.DC.viewer.app.pkg.MUI"
 
@@ -18,6 +27,7 @@ ACROBAT_RECEIPT_ATTRS = ["com.adobe.acrobat.DC.viewer.app.pkg.MUI",
                          "com.adobe.acrobat.DC.viewer.browser.pkg.MUI",
                          "com.adobe.acrobat.DC.viewer.print_automator.pkg.MUI",
                          "com.adobe.acrobat.DC.viewer.print_pdf_services.pkg.MUI"]
+_ACROBAT_RECEIPT_ATTRS = frozenset(ACROBAT_RECEIPT_ATTRS)
 
 
 def find_installer(mount_path: Path, pattern: str = "*/*.pkg", installer_prefix: str = "Installer") -> Path:
@@ -25,44 +35,33 @@ def find_installer(mount_path: Path, pattern: str = "*/*.pkg", installer_prefix:
     :param mount_path (str): mounted path of DMG to glob packages for
     :param pattern (str): glob pattern
     :param installer_prefix (str): installer prefix to test if the globbed item is the installer package"""
-    return [f for f in mount_path.glob(pattern) if installer_prefix in str(f)][0]
+    result = next((f for f in mount_path.glob(pattern) if installer_prefix in f.name), None)
+
+    if result is None:
+        raise FileNotFoundError(f"No {installer_prefix!r} package matching {pattern!r} found in {str(mount_path)!r}")
+
+    return result
 
 
 def flatten_choices(choices: List[Union[Dict, List]]) -> List[Dict]:
     """Flatten package choices data out from a Distribution file as the choices can be nested values
     :param choices (list or dict): choices to flatten out"""
-    result = list()
+    # Get a little messy, bare dicts are wrapped so every choice can be chained, anything else is dropped
+    return list(chain.from_iterable(c if isinstance(c, list) else (c,)
+                                    for c in choices if isinstance(c, (list, dict))))
 
-    # Get a little messy
-    for choice in choices:
-        if isinstance(choice, list):
-            for subchoice in choice:
-                result.append(subchoice)
-        elif isinstance(choice, dict):
-            result.append(choice)
 
-    return result
-
-
-def optional_receipts(dist_file: Path) -> Generator:
-    """Process the Distribution file from the Adobe Acrobat installer package for optional receipts
-    :param dist_file (Path): the Distribution script from the Acrobat installer"""
-    dist_xml = convert_xml(read_xml(dist_file))
+def _optional_receipts(dist_xml: Dict[Any, Any]) -> List[Dict[str, str]]:
+    """Process the parsed Distribution file from the Adobe Acrobat installer package for optional receipts
+    :param dist_xml (dict): the converted Distribution script from the Acrobat installer"""
     receipts = flatten_choices([c["pkg-ref"] for c in dist_xml["installer-gui-script"]["choice"]])
 
-    for receipt in receipts:
-        receipt_id = receipt["id"]
-        if receipt_id in ACROBAT_RECEIPT_ATTRS:
-            receipt_dict = {"packageid": receipt["id"],
-                            "version": receipt["version"]}
-            yield receipt_dict
+    return [{"packageid": r["id"], "version": r["version"]} for r in receipts if r["id"] in _ACROBAT_RECEIPT_ATTRS]
 
 
-def minimum_os_ver(dist_file: Path) -> Union[str, None]:
-    """Process the Distribution file from the Adobe Acrobat installer package for minimum OS version
-    :param dist_file (Path): the Distribution script from the Acrobat installer"""
-    dist_xml = convert_xml(read_xml(dist_file))
-
+def _minimum_os_ver(dist_xml: Dict[Any, Any]) -> Union[str, None]:
+    """Process the parsed Distribution file from the Adobe Acrobat installer package for minimum OS version
+    :param dist_xml (dict): the converted Distribution script from the Acrobat installer"""
     try:
         allowed_os_vers = dist_xml["installer-gui-script"]['volume-check']['allowed-os-versions']
         result = allowed_os_vers['os-version']['min']
@@ -72,10 +71,22 @@ def minimum_os_ver(dist_file: Path) -> Union[str, None]:
     return result
 
 
+def optional_receipts(dist_file: Path) -> List[Dict[str, str]]:
+    """Process the Distribution file from the Adobe Acrobat installer package for optional receipts
+    :param dist_file (Path): the Distribution script from the Acrobat installer"""
+    return _optional_receipts(convert_xml_iter(dist_file))
+
+
+def minimum_os_ver(dist_file: Path) -> Union[str, None]:
+    """Process the Distribution file from the Adobe Acrobat installer package for minimum OS version
+    :param dist_file (Path): the Distribution script from the Acrobat installer"""
+    return _minimum_os_ver(convert_xml_iter(dist_file))
+
+
 def app_version(pkg_info: Path) -> str:
     """Determine the correct Acrobat version from the application package
     :param pkg_info  (Path): path to the PackageInfo file to parse"""
-    pkginfo_xml = convert_xml(read_xml(pkg_info))
+    pkginfo_xml = convert_xml_iter(pkg_info)
     result = pkginfo_xml["pkg-info"]["version"]
 
     return result
@@ -106,17 +117,62 @@ def cleanup(mount_path: Path, tmp_dir: Path) -> None:
         shutil.rmtree(tmp_dir)
 
 
-def package_patch(dmg_file: Path) -> Dict[Any, Any]:
+def cache_file(dmg_file: Path, cache_dir: Path = ACROBAT_CACHE_DIR) -> Path:
+    """Return the cache file for a DMG file, keyed on the DMG path, size and modification time
+    :param dmg_file (Path): Acrobat DMG file
+    :param cache_dir (Path): directory cache files are stored in"""
+    stat = dmg_file.stat()
+    key = hashlib.blake2b(f"{dmg_file}|{stat.st_size}|{int(stat.st_mtime)}".encode()).hexdigest()
+
+    return cache_dir.joinpath(f"{key}.json")
+
+
+def write_cache(cached: Path, data: Dict[Any, Any]) -> None:
+    """Write values to a cache file, failing to write the cache does not stop the run
+    :param cached (Path): cache file to write
+    :param data (dict): values to cache"""
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename it into place so a partial cache file is never read
+        fd, tmp_file = mkstemp(dir=cached.parent, prefix=f".{cached.name}", suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+
+            os.replace(tmp_file, cached)
+        except BaseException:
+            os.unlink(tmp_file)
+            raise
+    except OSError as e:
+        print(f"Could not write Acrobat cache file {str(cached)!r}: {e}", file=sys.stderr)
+
+
+def package_patch(dmg_file: Path, use_cache: bool = True) -> Dict[Any, Any]:
     """Pull version and optional receipts data from the Adobe Acrobat package located in the Acrobat DMG
-    :param dmg_file (Path): Acrobat DMG file to mount and process"""
+    :param dmg_file (Path): Acrobat DMG file to mount and process
+    :param use_cache (bool): use (and store) values from a previous run against an unchanged DMG file"""
+    cached = cache_file(dmg_file)
+
+    if use_cache and cached.exists():
+        with open(cached, "r") as f:
+            return json.load(f)
+
     mount_path = dmg.mount(dmg_file)
-    installer = find_installer(mount_path)
-    tmp_pkg = expand_package(installer)
-    pkg_info_file = package_info(tmp_pkg)
-    dist_xml_file = distribution_script(tmp_pkg)
-    version = app_version(pkg_info_file)
-    receipts = [rd for rd in optional_receipts(dist_xml_file)]
-    min_os_ver = minimum_os_ver(dist_xml_file)
+    work_dir = Path(mkdtemp(prefix="acrobat"))  # Unique per call so packages can be processed concurrently
+
+    # Always detach the DMG and remove the expanded package, even when processing fails
+    try:
+        installer = find_installer(mount_path)
+        tmp_pkg = expand_package(installer, work_dir.joinpath("acrobat"))
+        pkg_info_file = package_info(tmp_pkg)
+        dist_xml_file = distribution_script(tmp_pkg)
+        dist_xml = convert_xml_iter(dist_xml_file)  # Parse once, used for both receipts and min os
+        version = app_version(pkg_info_file)
+        receipts = _optional_receipts(dist_xml)
+        min_os_ver = _minimum_os_ver(dist_xml)
+    finally:
+        cleanup(mount_path, work_dir)
 
     result = dict()
     result["receipts"] = receipts  # type: ignore[assignment]
@@ -126,6 +182,7 @@ def package_patch(dmg_file: Path) -> Dict[Any, Any]:
     if min_os_ver:
         result["min_os"] = min_os_ver
 
-    cleanup(mount_path, tmp_pkg)
+    if use_cache:
+        write_cache(cached, result)
 
     return result
@@ -1,11 +1,18 @@
 """Process app icon"""
+import hashlib
+import os
 import subprocess
 import shutil
 
 from pathlib import Path
-from typing import List, Optional, Union
+from tempfile import mkstemp
+from typing import Optional
 
-from .discover import walk_path
+from .discover import find_first, is_product_file, media_dir_filter
+
+
+# Cache of previously converted icons, keyed on the content hash of the source icon
+ICON_CACHE_DIR = Path("~/.cache/adobe-mun-kinobi/icons").expanduser()
 
 
 class SipsConversionException(Exception):
@@ -14,60 +21,74 @@ class SipsConversionException(Exception):
         super().__init__(self.message)
 
 
-def is_icon_file(f: Path, sap_code: str, name_pattern: str) -> bool:
-    """Determine if icon file is the right file
-    :param f (Path): icon file path
-    :param sap_code (str): Adobe SAP code for product being processed
-    :paaram name_pattern (str): icon filename pattern to test"""
-    return sap_code in str(f) and name_pattern in str(f)
-
-
-def find_app_icon(installer_pkg: Path, sap_code: str, name_pattern: str = 'appIcon2x') -> Optional[Union[Path, List, None]]:
+def find_app_icon(installer_pkg: Path, sap_code: str, name_pattern: str = 'appIcon2x') -> Optional[Path]:
     """Find corresponding app icon
     :param installer_pkg (Path): installer pkg to process icons from
     :param sap_code (str): Adobe SAP code for product being processed
     :paaram name_pattern (str): icon filename pattern to test"""
-    icon = [f for f in walk_path(installer_pkg, file_ext=None) if is_icon_file(f, sap_code, name_pattern)]
-    icon = icon[0] if len(icon) == 1 or len(icon) > 1 else icon
-    result = icon or None
-
-    return result
+    return find_first(installer_pkg, lambda e: is_product_file(e, sap_code, name_pattern),
+                      dir_filter=media_dir_filter(sap_code))
 
 
-def convert_icns_to_png(icon_src: Path, icon_dst: Path, dry_run: bool = False) -> None:
+def convert_icns_to_png(icon_src: Path, icon_dst: Path, dry_run: bool = False, use_cache: bool = True) -> None:
     """Use inbuilt sips to convert icns file to png
     :param icon_src (Path): source icon to copy
-    :param icon_dst (Path): destination of source icon"""
-    cmd = ["/usr/bin/sips", "-z", "256", "-s", "format", "png", icon_src, "--out", icon_dst]
-
+    :param icon_dst (Path): destination of source icon
+    :param use_cache (bool): reuse (and store) previous conversions of the same source icon"""
     if not dry_run:
-        p = subprocess.run(cmd, capture_output=True)
+        sips_dst = icon_dst
+        cached = None
+
+        if use_cache:
+            cached = ICON_CACHE_DIR.joinpath(f"{hashlib.sha256(icon_src.read_bytes()).hexdigest()}.png")
+
+            if cached.exists():
+                shutil.copyfile(cached, icon_dst)
+                return
+
+            # Convert to a temporary file, it only replaces the cached icon once the conversion is good
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_file = mkstemp(dir=cached.parent, prefix=f".{cached.stem}", suffix=".png")
+            os.close(fd)
+            sips_dst = Path(tmp_file)
+
+        try:
+            cmd = ["/usr/bin/sips", "-z", "256", "-s", "format", "png", icon_src, "--out", sips_dst]
+            p = subprocess.run(cmd, capture_output=True)
+
+            if p.returncode == 0 and "Warning" in p.stdout.decode("utf-8"):
+                raise SipsConversionException(p)
 
-        if p.returncode == 0 and "Warning" in p.stdout.decode("utf-8"):
-            raise SipsConversionException(p)
+            if cached and p.returncode == 0:
+                os.replace(sips_dst, cached)
+                shutil.copyfile(cached, icon_dst)
+        finally:
+            if cached and sips_dst.exists():
+                sips_dst.unlink()
 
 
-def copy_icon(icon_src: Path, icon_dst: Path, dry_run: bool = False) -> bool:
+def copy_icon(icon_src: Path, icon_dst: Path, dry_run: bool = False, use_cache: bool = True) -> bool:
     """Copy app icon into repo
     :param icon_src (Path): source icon to copy
-    :param icon_dst (Path): destination of source icon"""
+    :param icon_dst (Path): destination of source icon
+    :param use_cache (bool): reuse cached icon conversions"""
     result = False
+    dst_exists = icon_dst.exists()
 
-    if not dry_run and not icon_dst.exists():
-        if not icon_dst.parent.exists():
-            icon_dst.parent.mkdir(parents=True)
+    if not dry_run and not dst_exists:
+        icon_dst.parent.mkdir(parents=True, exist_ok=True)
 
-        if icon_dst.suffix == '.icns':
-            convert_icns_to_png(icon_src, icon_dst, dry_run)
+        if icon_src.suffix == '.icns':
+            convert_icns_to_png(icon_src, icon_dst, dry_run, use_cache)
         else:
-            shutil.copy(icon_src, icon_dst)
+            shutil.copyfile(icon_src, icon_dst)
 
         result = icon_dst.exists()
 
         if result:
             print(f"  > Copied icon {str(icon_dst.name)!r} to icons folder")
     elif dry_run:
-        if not icon_dst.exists():
+        if not dst_exists:
             print(f"  > Copy icon {str(icon_dst.name)!r} to icons folder")
         else:
             print(f"  > Icon {str(icon_dst.name)!r} exists in icons folder")
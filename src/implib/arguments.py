@@ -13,6 +13,8 @@ __VERSION__ = "1.0.20220315"
 __LICENSE__ = "Apache License 2.0"
 __VERSION_STRING__ = f"{__NAME__} v{__VERSION__} licensed for use under the {__LICENSE__} license"
 
+_SORTED_SAP_CODES = tuple(sorted(SAP_CODES))
+
 
 def parse_repo_url(repo_url: Path) -> str:
     """Convert repo_url to string and fix the file scheme that Path botches
@@ -32,7 +34,7 @@ def construct() -> argparse.Namespace:
     default_min_munki_ver = "2.1"
     default_display_name_suffix = "Creative Cloud"
     default_locale = "en_GB"
-    sap_codes = sorted([code for code in SAP_CODES])
+    sap_codes = _SORTED_SAP_CODES
     list_sap_codes_arg = "--list-sap-codes"
     parser = argparse.ArgumentParser()
 
@@ -132,6 +134,12 @@ def construct() -> argparse.Namespace:
                         dest="list_sap_codes",
                         help="list Adobe products SAP codes")
 
+    parser.add_argument("--no-cache",
+                        action="store_true",
+                        dest="no_cache",
+                        required=False,
+                        help="ignore values cached from previous runs and process all packages from scratch")
+
     parser.add_argument("-n", "--dry-run",
                         action="store_true",
                         dest="dry_run",
@@ -1,9 +1,13 @@
 """Functions related to discovery of Adobe files/packages"""
 import re
 
-from os import walk
+from os import DirEntry, path as os_path, scandir
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+
+_APRO_RE = re.compile(r"APRO\d+")
+_PRODUCT_NAME_RE = re.compile(r"_Install|_Uninstall")
 
 
 def is_installer(f: Path, file_ext: str = ".pkg", install_prefix: str = "_Install") -> bool:
@@ -14,49 +18,94 @@ def is_installer(f: Path, file_ext: str = ".pkg", install_prefix: str = "_Instal
     return install_prefix in str(f) and file_ext in str(f)
 
 
-def resolve_product_name(f: Path, file_ext: str = ".pkg", install_prefix: str = "_Install",
-                         uninstall_prefix: str = "_Uninstall") -> str:
-    """Resolves the product name for the specified file path
+def resolve_product_name(f: Path, file_ext: str = ".pkg") -> str:
+    """Resolves the product name for the specified file path, stripping the install/uninstall
+    prefix Adobe uses by default when generating packages
     :param f (Path): file path
-    :param file_ext (str): file extension
-    :param install_prefix (str): the string indicating the install package as named by
-                                 default when generated by Adobe
-    :param uninstall_prefix (str): the string indicating the uninstall package as named
-                                   by default when generated by Adobe"""
-    reg_pattern = re.compile(rf"{install_prefix}|{uninstall_prefix}")
-    result = str(Path(re.sub(reg_pattern, "", str(f))).name)
+    :param file_ext (str): file extension"""
+    result = str(Path(_PRODUCT_NAME_RE.sub("", str(f))).name)
 
     return result
 
 
+def _scandir_recursive(path: Union[str, Path],
+                       dir_filter: Optional[Callable[[DirEntry], bool]] = None) -> Iterator[DirEntry]:
+    """Recursively yield directory entries beneath a path, symlinks are yielded but not descended into
+    and unreadable directories are skipped (as os.walk does); entries are yielded in sorted path order,
+    scandir order is arbitrary so first matches would vary between machines
+    :param path (str, Path): directory to traverse
+    :param dir_filter (callable): optional test applied to each directory, directories that fail
+                                  the test are not descended into"""
+    try:
+        with scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        yield entry
+
+        if entry.is_dir(follow_symlinks=False) and (dir_filter is None or dir_filter(entry)):
+            yield from _scandir_recursive(entry.path, dir_filter)
+
+
+def media_dir_filter(sap_code: str, media_dir: str = "HD") -> Callable[[DirEntry], bool]:
+    """Return a directory filter that skips the media folders of other Adobe products
+    :param sap_code (str): Adobe SAP code for product being processed
+    :param media_dir (str): folder in the installer package containing a folder per product"""
+    def _filter(entry: DirEntry) -> bool:
+        # Each product (including dependencies) has its own folder in the media folder, only the
+        # folder for the product being processed needs to be traversed
+        return sap_code in entry.name or os_path.basename(os_path.dirname(entry.path)) != media_dir
+
+    return _filter
+
+
+def is_product_file(entry: DirEntry, sap_code: str, name_pattern: str) -> bool:
+    """Determine if a directory entry is the named file belonging to a product
+    :param entry (DirEntry): directory entry to test
+    :param sap_code (str): Adobe SAP code for product being processed
+    :param name_pattern (str): filename pattern to test"""
+    return name_pattern in entry.name and sap_code in entry.path  # Name test is the more selective, so test it first
+
+
+def find_first(d: Path, predicate: Callable[[DirEntry], bool],
+               dir_filter: Optional[Callable[[DirEntry], bool]] = None) -> Optional[Path]:
+    """Return the first file in a specified path that matches the predicate, stopping the walk on first match
+    :param d (Path): directory to traverse
+    :param predicate (callable): test applied to each file entry
+    :param dir_filter (callable): optional test applied to each directory to prune the walk"""
+    d = d.expanduser()
+
+    if d.exists():
+        for entry in _scandir_recursive(d, dir_filter):
+            if entry.is_file() and predicate(entry):
+                return Path(entry.path)
+
+    return None
+
+
 def walk_path(d: Path, file_ext: Optional[Union[str, None]] = ".pkg") -> List:
     """Walk subdirectories in a specified path for the specified file extension
     :param d (Path): directory to traverse searching for specific file extensions
     :param file_ext (str): the file extension to filter on"""
     result = list()
-    found_files = set()
-    folder_file_exts = [".pkg", ".dmg"]  # These we treat a little differently
-    d = d.expanduser()
+    d = d.expanduser()  # Only the root needs expanding, DirEntry paths beneath it are already expanded
 
     if d.exists():
-        for path_root, dirs, files in walk(d):
-            if file_ext in folder_file_exts:
-                for _ in dirs:
-                    pkg = Path(path_root).joinpath(_)
-
-                    if file_ext == ".dmg":
-                        dmg_glob = [f for f in pkg.glob("*.dmg")]
-                        dmg_file = "".join([str(f) for f in dmg_glob if re.search(r"APRO\d+", str(f))])
-                        pkg = pkg.joinpath(dmg_file)
-
-                    if pkg.suffix == file_ext:
-                        found_files.add(pkg)
-            else:
-                for f in files:
-                    fn = Path(path_root).joinpath(f)
-                    found_files.add(fn)
+        if file_ext == ".pkg":
+            # Installer packages are bundles, so these are directories
+            entries = (e for e in _scandir_recursive(d)
+                       if e.is_dir() and e.name.endswith(file_ext))
+        elif file_ext == ".dmg":
+            # The Acrobat DMG lives in an APRO<version> folder, the DMG name itself may not include it
+            entries = (e for e in _scandir_recursive(d)
+                       if e.is_file() and e.name.endswith(file_ext) and _APRO_RE.search(e.path))
+        else:
+            entries = (e for e in _scandir_recursive(d)
+                       if e.is_file() and (not file_ext or e.name.endswith(file_ext)))
 
-    result = sorted([f for f in found_files])
+        result = sorted(Path(e.path) for e in entries)
 
     return result
 
@@ -68,14 +117,14 @@ def adobe_packages(d: Path) -> Dict[Any, Any]:
     packages = walk_path(d)
 
     for pkg in packages:
-        product_name = resolve_product_name(f=Path(pkg))
+        product_name = resolve_product_name(f=pkg)
         product_dict = dict()
 
         if is_installer(f=pkg):
             acrobat_setup_dir = pkg.joinpath("Contents/Resources/Setup")
             product_dict["installer"] = pkg
             try:
-                product_dict["dmg_file"] = list(walk_path(acrobat_setup_dir, file_ext=".dmg"))[0]
+                product_dict["dmg_file"] = walk_path(acrobat_setup_dir, file_ext=".dmg")[0]
             except IndexError:
                 pass  # Yeah, do _nothing_, this is how I want this to be handled.
         else:
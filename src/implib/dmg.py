@@ -1,26 +1,28 @@
 """hdiutil wrapper"""
-import plistlib
+import re
 import subprocess
 
 from pathlib import Path
+from xml.sax.saxutils import unescape
 
+from .process import ProcessException
 
-class DMGException(Exception):
+
+# Only the mount point is needed from the hdiutil plist output, so pluck it out directly
+_MOUNT_RE = re.compile(rb"<key>mount-point</key>\s*<string>([^<]+)</string>")
+
+
+class DMGException(ProcessException):
     """DMG Exception
     :param p (subprocess.CompletedProcess): subprocess"""
-    def __init__(self, p: subprocess.CompletedProcess) -> None:
-        self.exit_code = p.returncode
-        self.stdout = p.stdout.decode("utf-8")
-        self.stderr = p.stderr.decode("utf-8")
-        self.message = f"hdiutil exited with exit code {self.exit_code}: {self.stdout or self.stderr}"
-        super().__init__(self.message)
+    tool = "hdiutil"
 
 
 def get_mount_point(s: bytes) -> Path:
     """Resolve the mount point of a DMG file
     :param s (bytes): property list byte string"""
-    entities = plistlib.loads(s)["system-entities"]
-    mount_point = "".join([entity["mount-point"] for entity in entities if entity.get("mount-point")])
+    match = _MOUNT_RE.search(s)
+    mount_point = unescape(match.group(1).decode("utf-8")) if match else ""
 
     return Path(mount_point)
 
@@ -1,22 +1,42 @@
 """munkiimport wrapper"""
 import subprocess
 
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 from .package import AdobePackage
+from .process import ProcessException
 
 
-class MunkiImportException(Exception):
+_SUCCESS_PREFIX = "Saved pkginfo to "
+
+_REQUIRED_KWARGS = frozenset({"--repo_url",
+                              "--uninstallerpkg",
+                              "--subdirectory"})
+
+_VALID_KWARGS = frozenset({"--category",
+                           "--catalog",
+                           "--developer",
+                           "--repo_url",
+                           "--subdirectory",
+                           "--minimum_os_version",
+                           "--displayname",
+                           "--description",
+                           "--name",
+                           "--icon",
+                           "--minimum_munki_version",
+                           "--arch",
+                           "--uninstallerpkg",
+                           "--pkgvers"})
+
+
+class MunkiImportException(ProcessException):
     """Munki Import Exception
     :param p (subprocess.CompletedProcess): subprocess"""
-    def __init__(self, p: subprocess.CompletedProcess) -> None:
-        self.exit_code = p.returncode
-        self.stdout = p.stdout.decode("utf-8")
-        self.stderr = p.stderr.decode("utf-8")
-        self.message = f"munkiimport exited with exit code {self.exit_code}: {self.stdout or self.stderr}"
-        super().__init__(self.message)
+    tool = "munkiimport"
 
 
 class MunkiRequiredKwargsException(Exception):
@@ -39,65 +59,51 @@ class MunkiInvalidKwargsException(Exception):
         super().__init__(self.message)
 
 
-class MakeCatalogsException(Exception):
+class MakeCatalogsException(ProcessException):
     """Make Catalogs Exception
     :param p (subprocess.CompletedProcess): subprocess"""
-    def __init__(self, p: subprocess.CompletedProcess) -> None:
-        self.exit_code = p.returncode
-        self.stdout = p.stdout.decode("utf-8")
-        self.stderr = p.stderr.decode("utf-8")
-        self.message = f"makecatalogs exited with exit code {self.exit_code}: {self.stdout or self.stderr}"
-        super().__init__(self.message)
+    tool = "makecatalogs"
 
 
 def has_all_required_args(args: Dict[Any, Any]) -> None:
     """Check all required arguments are supplied
     :param args (dict): arguments to validate"""
-    reqd_kwargs = ["--repo_url",
-                   "--uninstallerpkg",
-                   "--subdirectory"]
+    missing_args = _REQUIRED_KWARGS - args.keys()
 
-    if not all([arg in args for arg in reqd_kwargs]):
-        missing_args = [arg for arg in reqd_kwargs if arg not in args]
-
-        raise MunkiRequiredKwargsException(missing_args)
+    if missing_args:
+        raise MunkiRequiredKwargsException(sorted(missing_args))
 
 
 def has_valid_kwargs(args: Dict[Any, Any]) -> None:
     """Check all keyword arguments provided are valid
     :param args (dict): arguments to validate"""
-    valid_kwargs = ["--category",
-                    "--catalog",
-                    "--developer",
-                    "--repo_url",
-                    "--subdirectory",
-                    "--minimum_os_version",
-                    "--displayname",
-                    "--description",
-                    "--name",
-                    "--icon",
-                    "--minimum_munki_version",
-                    "--arch",
-                    "--uninstallerpkg",
-                    "--pkgvers"]
-
-    invalid_args = [arg for arg, _ in args.items() if arg not in valid_kwargs]
+    invalid_args = args.keys() - _VALID_KWARGS
 
     if invalid_args:
-        raise MunkiInvalidKwargsException(invalid_args, valid_kwargs)
+        raise MunkiInvalidKwargsException(sorted(invalid_args), sorted(_VALID_KWARGS))
+
 
+@lru_cache(maxsize=None)
+def repo_path(munki_repo: Union[str, Path]) -> str:
+    """Return the local path of the munki repo, the repo URL does not change during a run so parse once
+    :param munki_repo (str): munki repo URL, e.g. file:///Volumes/munki_repo"""
+    return urlparse(str(munki_repo)).path
 
-def pkginfo_file(output: str, munki_repo: str) -> Optional[Path]:
+
+def pkginfo_file(output: str, munki_repo_path: str) -> Optional[Path]:
     """Parse output and return the success message
     :param output (str): output from munkiimport to parse
-    :param munki_repo (str): base path of the munki_repo folder, e.g. file:///Volumes/munki_repo"""
-    success_prefix = "Saved pkginfo to "
-    f = "".join([line.strip() for line in output.splitlines()
-                 if line.startswith(success_prefix)]).replace(success_prefix, "")
+    :param munki_repo_path (str): local path of the munki_repo folder, e.g. /Volumes/munki_repo"""
+    idx = output.find(_SUCCESS_PREFIX)
+
+    if idx < 0:
+        return None
 
-    munki_repo = urlparse(str(munki_repo)).path
-    pkginfo = str(f).replace(success_prefix, "").rstrip(".")
-    result = Path(munki_repo).joinpath(pkginfo)
+    # Slice out only the saved path rather than copying the remaining output
+    start = idx + len(_SUCCESS_PREFIX)
+    end = output.find("\n", start)
+    pkginfo = output[start:end if end != -1 else None].strip().rstrip(".")
+    result = Path(munki_repo_path).joinpath(pkginfo)
 
     return result
 
@@ -115,16 +121,11 @@ def update_import_cmd(pkg: AdobePackage, dry_run: bool = False, **kwargs) -> Lis
     uninstaller = pkg.uninstaller
 
     # Convert all values to strings to avoid issues when printing the cmd in dry runs
-    for k, v in kwargs.items():
-        if dry_run and k in ["--uninstallerpkg"]:
-            result.extend([k, str(uninstaller.name)])
-        else:
-            result.extend([k, str(v)])
+    result += chain.from_iterable((k, str(uninstaller.name) if dry_run and k == "--uninstallerpkg" else str(v))
+                                  for k, v in kwargs.items())
 
     # Add any blocking apps
-    if pkg.blocking_apps:
-        for app in pkg.blocking_apps:
-            result.extend(["--blocking-application", app])
+    result += chain.from_iterable(("--blocking-application", app) for app in pkg.blocking_apps)
 
     # Add the package to import as the last item
     if not dry_run:
@@ -151,7 +152,7 @@ def package(pkg: AdobePackage, dry_run: bool = False, **kwargs) -> Optional[Path
         p = subprocess.run(cmd, capture_output=True, encoding="utf-8")  # type: ignore[arg-type]
 
         if p.returncode == 0:
-            result = pkginfo_file(p.stdout, munki_repo)
+            result = pkginfo_file(p.stdout, repo_path(munki_repo))
             print(f"Imported {pkg.pkg_name!r}")
         else:
             raise MunkiImportException(p)
@@ -159,6 +160,24 @@ def package(pkg: AdobePackage, dry_run: bool = False, **kwargs) -> Optional[Path
     return result
 
 
+def package_many(jobs: List[Tuple[AdobePackage, Dict[Any, Any]]],
+                 dry_run: bool = False) -> List[Tuple[AdobePackage, Optional[Path], Optional[MunkiImportException]]]:
+    """Import a batch of packages in to the munki repo one at a time, makecatalogs is not run; a failed
+    import is collected with its package and does not stop the remaining imports
+    :param jobs (list): list of (AdobePackage instance, munkiimport keyword arguments) pairs
+    :dry_run (bool): perform a dry run (does not import packages)"""
+    # Imports are serial, concurrent munkiimport runs into the same repo can race creating folders
+    result: List[Tuple[AdobePackage, Optional[Path], Optional[MunkiImportException]]] = list()
+
+    for pkg, kwargs in jobs:
+        try:
+            result.append((pkg, package(pkg, dry_run, **kwargs), None))
+        except MunkiImportException as e:
+            result.append((pkg, None, e))
+
+    return result
+
+
 def makecatalogs(munki_repo: Path) -> None:
     """Run the makecatalogs utility after importing
     :param munki_repo (Path): munki repo to use in makecatalogs run"""
@@ -1,11 +1,22 @@
 """munki repo"""
-import plistlib
 import sys
 
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Mapping
+from urllib.parse import urlparse
 
 from .arguments import parse_repo_url
+from . import plist
+
+
+@lru_cache(maxsize=1)
+def load_preferences(preference_file: Path) -> Mapping[Any, Any]:
+    """Load a preference file once, subsequent calls return the cached (read only) preferences
+    :param preference_file (Path): preference file to load"""
+    with open(preference_file, 'rb') as f:
+        return MappingProxyType(plist.load(f))
 
 
 class MunkiImportPreferences:
@@ -14,18 +25,19 @@ class MunkiImportPreferences:
         self.domain = domain
         self.user = Path("~/Library/Preferences").expanduser().joinpath(self.domain)
         self.system = Path("/Library/Preferences").joinpath(self.domain)
+        # Read once, a single instance is shared with everything that needs munkiimport preferences
+        self.preferences = self.read_preferences()
 
     def find_preference_file(self) -> Path:
         """Find the munkiimport preference file, preferring user domain over system domain"""
         return self.user if self.user.exists() else self.system
 
-    def read_preferences(self) -> Dict[Any, Any]:
+    def read_preferences(self) -> Mapping[Any, Any]:
         """Read the munkiimport preference file"""
         preference_file = self.find_preference_file()
 
         try:
-            with open(preference_file, 'rb') as f:
-                return plistlib.load(f)
+            return load_preferences(preference_file)
         except FileNotFoundError:
             configure_munkiimport = "munkiimport --configure"
             message = (f"Could not find preference files at either:\n - {str(self.user)!r}\n - {str(self.system)!r}\n"
@@ -35,27 +47,35 @@ class MunkiImportPreferences:
             print(message, file=sys.stderr)
             sys.exit(2)
 
-    @property
+    @cached_property
     def repo_url(self) -> Path:
         """repo_url from preference file"""
-        prefs = self.read_preferences()
-        repo_url = prefs.get("repo_url", "file:///Volumes/munki_repo")
+        repo_url = self.preferences.get("repo_url", "file:///Volumes/munki_repo")
         result = Path(parse_repo_url(repo_url))
 
         return result
 
-    @property
+    @cached_property
     def pkginfo_extension(self) -> str:
         """pkginfo_extension from preference file"""
-        prefs = self.read_preferences()
-        return prefs.get("pkginfo_extension", ".plist")
+        return self.preferences.get("pkginfo_extension", ".plist")
 
-    @property
+    @cached_property
     def pkgsinfo_directory(self) -> Path:
         """pkgsinfo path from repo_url"""
         return self.repo_url.joinpath("pkgsinfo")
 
-    @property
+    @cached_property
     def icon_directory(self) -> Path:
         """icon directory from repo_url"""
         return self.repo_url.joinpath("icons")
+
+    @cached_property
+    def pkgsinfo_path(self) -> Path:
+        """local filesystem path of the pkgsinfo directory"""
+        return Path(urlparse(str(self.pkgsinfo_directory)).path)
+
+    @cached_property
+    def icon_path(self) -> Path:
+        """local filesystem path of the icon directory"""
+        return Path(urlparse(str(self.icon_directory)).path)
@@ -1,49 +1,59 @@
 """Adobe Package"""
-import plistlib
-
 from dataclasses import dataclass, field
 from pathlib import Path
-from sys import exit
-from typing import Any, Dict, List, Optional, Union, TYPE_CHECKING
-from urllib.parse import urlparse
+from sys import exit, version_info
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Sequence, Union, TYPE_CHECKING
+from xml.etree import ElementTree
 
 from .appicon import find_app_icon
-from .xmltodict import convert_xml, read_xml
+from .xmltodict import read_xml
 from . import acrobat
 from . import application
+from . import plist
 
 
 if TYPE_CHECKING:
     from .munkirepo import MunkiImportPreferences
 
 # Blocking apps
-BLOCKING_APPS = {"APRO": ["Microsoft Word", "Safari"]}
+BLOCKING_APPS = MappingProxyType({"APRO": ("Microsoft Word", "Safari")})
+_EMPTY: tuple = ()  # Shared default for packages without blocking apps
+
+# Package bundle contents, relative to the package path
+_OPT_XML_SUBPATH = ("Contents", "Resources", "optionXML.xml")
+_INFO_PLIST_SUBPATH = ("Contents", "Info.plist")
 
 # Current SAP codes for Adobe products.
 # https://helpx.adobe.com/uk/enterprise/admin-guide.html/uk/enterprise/kb/apps-deployed-without-base-versions.ug.html
-SAP_CODES = {"AEFT": "Adobe After Effects",
-             "AICY": "Adobe InCopy",
-             "AME": "Adobe Media Encoder",
-             "APRO": "Adobe Acrobat Pro",
-             "AUDT": "Adobe Audition",
-             "CHAR": "Adobe Character Animator",
-             "DRWV": "Adobe Dreamweaver",
-             "ESHR": "Adobe Dimension",
-             "FLPR": "Adobe Animate and Mobile Device Packaging",
-             "FRSC": "Adobe Fresco",
-             "IDSN": "Adobe InDesign",
-             "ILST": "Adobe Illustrator",
-             "KBRG": "Adobe Bridge",
-             "LRCC": "Adobe Lightroom",
-             "LTRM": "Adobe Lightroom Classic",
-             "PHSP": "Adobe Photoshop",
-             "PPRO": "Adobe Premiere Pro",
-             "PRLD": "Adobe Prelude",
-             "RUSH": "Adobe Premiere Rush",
-             "SBSTA": "Adobe Substance Alchemist",
-             "SBSTD": "Adobe Substance Designer",
-             "SBSTP": "Adobe Substance Painter",
-             "SPRK": "Adobe XD"}
+SAP_CODES = MappingProxyType({"AEFT": "Adobe After Effects",
+                              "AICY": "Adobe InCopy",
+                              "AME": "Adobe Media Encoder",
+                              "APRO": "Adobe Acrobat Pro",
+                              "AUDT": "Adobe Audition",
+                              "CHAR": "Adobe Character Animator",
+                              "DRWV": "Adobe Dreamweaver",
+                              "ESHR": "Adobe Dimension",
+                              "FLPR": "Adobe Animate and Mobile Device Packaging",
+                              "FRSC": "Adobe Fresco",
+                              "IDSN": "Adobe InDesign",
+                              "ILST": "Adobe Illustrator",
+                              "KBRG": "Adobe Bridge",
+                              "LRCC": "Adobe Lightroom",
+                              "LTRM": "Adobe Lightroom Classic",
+                              "PHSP": "Adobe Photoshop",
+                              "PPRO": "Adobe Premiere Pro",
+                              "PRLD": "Adobe Prelude",
+                              "RUSH": "Adobe Premiere Rush",
+                              "SBSTA": "Adobe Substance Alchemist",
+                              "SBSTD": "Adobe Substance Designer",
+                              "SBSTP": "Adobe Substance Painter",
+                              "SPRK": "Adobe XD"})
+
+_SAP_PADDING = len(max(SAP_CODES, key=len))
+
+# Slotted dataclasses drop the per instance __dict__, but are only supported from Python 3.10
+_DATACLASS_SLOTS = {"slots": True} if version_info >= (3, 10) else {}
 
 # Supported locales
 SUPPORTED_LOCALES = ["ar_AE",
@@ -80,8 +90,19 @@ SUPPORTED_LOCALES = ["ar_AE",
                      "zh_CN",
                      "zh_TW"]
 
+SUPPORTED_LOCALES_SET = frozenset(SUPPORTED_LOCALES)  # Membership tests, SUPPORTED_LOCALES keeps the display order
+
+
+class UnsupportedMediaException(Exception):
+    """Unsupported Media Exception
+    :param sap_codes (list): SAP codes of the media found in the optionXML file"""
+    def __init__(self, sap_codes: List) -> None:
+        self.sap_codes = sap_codes
+        self.message = f"No media with a supported SAP code found, media SAP codes: {self.sap_codes!r}"
+        super().__init__(self.message)
+
 
-@dataclass(eq=True, order=True)
+@dataclass(eq=True, order=True, **_DATACLASS_SLOTS)
 class AdobePackage:
     pkg_name: str = field(compare=True)  # Compare on pkg_name, arch, and sap_code only
     arch: str = field(compare=True)
@@ -92,12 +113,13 @@ class AdobePackage:
     installer: Path = field(compare=False)
     uninstaller: Path = field(compare=False)
     receipts: list = field(compare=False)
-    blocking_apps: list = field(compare=False)
+    blocking_apps: Sequence[str] = field(compare=False)
     app_icon: Union[Path, None] = field(compare=False)
     icon_dir: Path = field(compare=False, repr=False)
     description: str = field(compare=False)
     pkginfo_file: str = field(compare=False, repr=False)
     imported: bool = field(default=False, compare=False)
+    icon: Path = field(init=False, compare=False, repr=False)
 
     def __post_init__(self):
         self.icon = self.icon_dir.joinpath(f"{self.pkg_name}-{self.version}.png")
@@ -105,14 +127,13 @@ class AdobePackage:
 
 def list_sap_codes() -> None:
     """List SAP codes with human friendly names"""
-    padding = len(max([sc for sc, _ in SAP_CODES.items()], key=len))
     source = ("https://helpx.adobe.com/uk/enterprise/admin-guide.html/uk/enterprise/"
               "kb/apps-deployed-without-base-versions.ug.html")
 
     print(f"Sourced from: {source}")
 
     for sap_code, prod_name in SAP_CODES.items():
-        print(f" {sap_code.ljust(padding)} - {prod_name}")
+        print(f" {sap_code.ljust(_SAP_PADDING)} - {prod_name}")
 
     exit()
 
@@ -133,58 +154,45 @@ def get_min_os_ver(f: Path) -> str:
     result = None
 
     with open(f, "rb") as plist_file:
-        plist = plistlib.load(plist_file)
-        result = plist.get("LSMinimumSystemVersion")
+        result = plist.load_key(plist_file, "LSMinimumSystemVersion")
 
     return result
 
 
-def process_hdmedia(hdmedia: Union[List, Dict[Any, Any]]) -> Dict[Any, Any]:
-    """Pull out the relevant HDMedia dictionary based on SAP code values
-    :param hdmedia (list): list of HDMedia dictionaries"""
-    # Note: HDMedia can be either a list or a dict, depending on whether
-    #       the value is being passed in from Adobe Acrobat or a
-    #       optionXML.xml file from other Adobe apps
-    try:
-        for media in hdmedia:
-            sap_code = media.get("SAPCode")
-
-            if sap_code and sap_code in SAP_CODES:
-                result = media
-                break
-    except AttributeError:
-        result = hdmedia
+def element_text(elem: ElementTree.Element, path: str) -> Optional[str]:
+    """Return the stripped text of the first sub element matching the path
+    :param elem (ElementTree.Element): element to search
+    :param path (str): path of the sub element"""
+    text = elem.findtext(path)
 
-    return result
+    return text.strip() if text is not None else None
 
 
-def process_display_name(sap_code: str) -> str:
-    """Parse out a display name for the package based on information in the media dict
-    :param sap_code (str): SAP Code for the product"""
-    return SAP_CODES[sap_code]
+def process_hdmedia(hdmedia: List[ElementTree.Element]) -> Optional[ElementTree.Element]:
+    """Pull out the relevant HDMedia element based on SAP code values
+    :param hdmedia (list): list of HDMedia elements"""
+    return next((media for media in hdmedia if element_text(media, "SAPCode") in SAP_CODES), None)
 
 
-def process_opt_xml(install_info: Dict[Any, Any]) -> Dict[Any, Any]:
-    """Process specific components of the OptionXML dict
-    :param xml (dict): dictionary to pull values from
-    :param acrobat (bool): process different values from the XML"""
+def process_opt_xml(install_info: ElementTree.Element) -> Dict[Any, Any]:
+    """Process specific components of the OptionXML file
+    :param install_info (ElementTree.Element): InstallInfo root element to pull values from"""
     # Note: The Acrobat optionXML.xml file does not appear to have the
-    #       same HDMedias key structure as other packages, so handle
-    #       this through the try/except catcher
-    try:
-        hdmedia = process_hdmedia(install_info["Medias"]["Media"])
-    except TypeError:
-        hdmedia = process_hdmedia(install_info["HDMedias"]["HDMedia"])
+    #       same HDMedias structure as other packages, it uses Medias
+    medias = install_info.findall("Medias/Media") or install_info.findall("HDMedias/HDMedia")
+    hdmedia = process_hdmedia(medias)
+
+    if hdmedia is None:
+        raise UnsupportedMediaException([element_text(media, "SAPCode") for media in medias])
 
     result = dict()
-    sap_code = hdmedia["SAPCode"]
-    arch = install_info["ProcessorArchitecture"]
-    display_name = process_display_name(sap_code)
+    sap_code = hdmedia.findtext("SAPCode", "").strip()  # Always a SAP_CODES key, process_hdmedia matched on it
+    arch = element_text(install_info, "ProcessorArchitecture")
 
-    result["pkg_name"] = install_info.get("PackageName")
-    result["display_name"] = display_name
+    result["pkg_name"] = element_text(install_info, "PackageName")
+    result["display_name"] = SAP_CODES[sap_code]
     result["arch"] = "x86_64" if arch and arch == "x64" else arch
-    result["version"] = hdmedia.get("productVersion")
+    result["version"] = element_text(hdmedia, "productVersion")
     result["sap_code"] = sap_code
 
     return result
@@ -204,12 +212,16 @@ def process_app_description(install_pkg: Path, sap_code: str, locale: str) -> st
         desc_locales = app_json["ProductDescription"]["Tagline"]["Language"]
 
     descriptions = list()
+    seen = set()  # Keeps the duplicate check constant time, descriptions keeps the order
 
     # Adobe does weird stuff, like duplicate strings...
     for desc in desc_locales:
         _locale = desc["locale"]
-        if _locale == locale and _locale in SUPPORTED_LOCALES and desc["value"] not in descriptions:
-            descriptions.append(desc["value"])
+        value = desc["value"]
+
+        if _locale == locale and _locale in SUPPORTED_LOCALES_SET and value not in seen:
+            seen.add(value)
+            descriptions.append(value)
 
     result = " ".join(descriptions) if len(descriptions) > 1 else "".join(descriptions)
 
@@ -226,32 +238,51 @@ def guess_pkginfo_file(pkg_name: Path, version: str, pkginfo_ext: str) -> str:
     return result
 
 
+def process_package_light(install_pkg: Path, munkiimport_prefs: 'MunkiImportPreferences') -> Dict[Any, Any]:
+    """Process only the optionXML.xml values of an installer package, enough to tell which product it is
+    and if it has already been imported without the icon, description, and Acrobat DMG work
+    :param install_pkg (Path): path to install package
+    :param munkiimport_prefs (MunkiImportPreferences): instance of MunkiImportPreferences"""
+    result = process_opt_xml(read_xml(install_pkg.joinpath(*_OPT_XML_SUBPATH)))
+    # Acrobat takes its version from the package in the DMG, so its pkginfo file can't be guessed yet
+    result["pkginfo_file"] = None
+
+    if result["sap_code"] != "APRO":
+        result["pkginfo_file"] = guess_pkginfo_file(result["pkg_name"], result["version"], munkiimport_prefs.pkginfo_extension)
+
+    return result
+
+
 def process_package(install_pkg: Path, uninstall_pkg: Path, munkiimport_prefs: 'MunkiImportPreferences',
-                    locale: str = "en_GB", dmg_file: Optional[Path] = None) -> AdobePackage:
+                    locale: str = "en_GB", dmg_file: Optional[Path] = None, use_cache: bool = True,
+                    opt_values: Optional[Dict[Any, Any]] = None) -> AdobePackage:
     """Process an installer package for product information
     :param install_pkg (Path): path to install package
     :param uninstall_pkg (Path): path to uninstall package
     :param munkiimport_prefs (MunkiImportPreferences): instance of MunkiImportPreferences
     :param locale (str): locale used when building package
-    :param dmg_file (str): DMG file to mount (currently only applies to Acrobat)"""
-    opt_xml = install_pkg.joinpath("Contents/Resources/optionXML.xml")
-    info_plist = install_pkg.joinpath("Contents/Info.plist")
-    install_info = convert_xml(read_xml(opt_xml))["InstallInfo"]
+    :param dmg_file (str): DMG file to mount (currently only applies to Acrobat)
+    :param use_cache (bool): use cached values from previously processed DMG files (currently only applies to Acrobat)
+    :param opt_values (dict): values from process_package_light, the optionXML file is not read again"""
+    info_plist = install_pkg.joinpath(*_INFO_PLIST_SUBPATH)
+
+    if opt_values is None:
+        opt_values = process_package_light(install_pkg, munkiimport_prefs)
 
-    package = process_opt_xml(install_info)
+    package = dict(opt_values)
     package["installer"] = install_pkg
     package["uninstaller"] = uninstall_pkg
     package["min_os"] = get_min_os_ver(info_plist)
-    package["blocking_apps"] = BLOCKING_APPS.get(package["sap_code"], list())
+    package["blocking_apps"] = BLOCKING_APPS.get(package["sap_code"], _EMPTY)
     package["receipts"] = list()
     package["app_icon"] = find_app_icon(install_pkg, package["sap_code"])
-    package["icon_dir"] = Path(urlparse(str(munkiimport_prefs.icon_directory)).path)
+    package["icon_dir"] = munkiimport_prefs.icon_path
 
     if package["sap_code"] != "APRO":
         package["description"] = process_app_description(install_pkg, package["sap_code"], locale)
 
     if package["sap_code"] == "APRO":
-        acrobat_patches = acrobat.package_patch(dmg_file)  # type: ignore[arg-type]
+        acrobat_patches = acrobat.package_patch(dmg_file, use_cache)  # type: ignore[arg-type]
         package["description"] = "Adobe Acrobat Pro DC makes your job easier every day with the trusted PDF converter."
         package.update(acrobat_patches)
 
@@ -2,8 +2,8 @@ import plistlib
 
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union, TYPE_CHECKING
-from urllib.parse import urlparse
 
+from . import plist
 from .discover import walk_path
 
 if TYPE_CHECKING:
@@ -16,7 +16,7 @@ def read_pkginfo(pkginfo: Union[str, Path]) -> Dict[Any, Any]:
     result: Dict[Any, Any] = dict()
 
     with open(pkginfo, "rb") as f:
-        result = plistlib.load(f)
+        result = plist.load(f)
 
     return result
 
@@ -33,21 +33,19 @@ def update(pkginfo: Union[str, Path], dry_run: bool = False, receipts: Optional[
     """Update the specified pkginfo with additional data
     :param pkginfo (str, Path, Purepath): path to the pkginfo file to update
     :param receipts (dict): any receipts that need to be updated in the pkginfo"""
-    if not dry_run:
-        patch = dict()
-        pkginfo_data = read_pkginfo(pkginfo)
+    if dry_run or not receipts:
+        return
 
-        if receipts:
-            patch["receipts"] = receipts
+    pkginfo_data = read_pkginfo(pkginfo)
 
-        if patch:
-            pkginfo_data.update(patch)
-            write_pkginfo(pkginfo, pkginfo_data)
-            print(f"Updated pkginfo {str(pkginfo)!r}")
+    # Skip the write if the pkginfo already has these receipts
+    if pkginfo_data.get("receipts") != receipts:
+        pkginfo_data["receipts"] = receipts
+        write_pkginfo(pkginfo, pkginfo_data)
+        print(f"Updated pkginfo {str(pkginfo)!r}")
 
 
 def existing_pkginfo(munkiimport_prefs: 'MunkiImportPreferences') -> List:
     """Returns existing pkginfo files from the munki repo
     :param munkiimport_prefs (MunkiImportPreferences): instance of MunkiImportPreferences"""
-    repo_url = Path(urlparse(str(munkiimport_prefs.pkgsinfo_directory)).path)
-    return walk_path(repo_url, munkiimport_prefs.pkginfo_extension)
+    return walk_path(munkiimport_prefs.pkgsinfo_path, munkiimport_prefs.pkginfo_extension)
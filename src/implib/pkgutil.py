@@ -4,16 +4,13 @@ import subprocess
 from pathlib import Path
 from tempfile import gettempdir
 
+from .process import ProcessException
 
-class PkgutilException(Exception):
+
+class PkgutilException(ProcessException):
     """pkgutil Exception
     :param p (subprocess.CompletedProcess): subprocess"""
-    def __init__(self, p: subprocess.CompletedProcess) -> None:
-        self.exit_code = p.returncode
-        self.stdout = p.stdout.strip()
-        self.stderr = p.stderr.strip()
-        self.message = f"pkgutil exited with exit code {self.exit_code}: {self.stdout or self.stderr}"
-        super().__init__(self.message)
+    tool = "pkgutil"
 
 
 def expand_package(pkg: Path, tmp_dir: Path = Path(gettempdir()).joinpath("acrobat")) -> Path:
@@ -22,7 +19,7 @@ def expand_package(pkg: Path, tmp_dir: Path = Path(gettempdir()).joinpath("acrob
     :param tmp_dir (str): temporary directory to expand to"""
     result = Path(tmp_dir)
     cmd = ["/usr/sbin/pkgutil", "--expand", pkg, tmp_dir]
-    p = subprocess.run(cmd, capture_output=True, encoding="utf-8")  # type: ignore[arg-type]
+    p = subprocess.run(cmd, capture_output=True)  # type: ignore[arg-type]
 
     if not p.returncode == 0:
         raise PkgutilException(p)
@@ -0,0 +1,211 @@
+"""Property list reading, uses lxml when available and falls back to plistlib"""
+import mmap
+import plistlib
+import re
+
+from base64 import b64decode
+from contextlib import contextmanager
+from datetime import datetime
+from io import BytesIO
+from typing import Any, BinaryIO, Iterator, List, Optional
+
+# Same pattern plistlib uses, every field after the year is optional
+_DATE_RE = re.compile(r"(\d\d\d\d)(?:-(\d\d)(?:-(\d\d)(?:T(\d\d)(?::(\d\d)(?::(\d\d))?)?)?)?)?Z", re.ASCII)
+
+try:
+    from lxml import etree  # type: ignore[import-untyped, import-not-found]
+except ImportError:
+    etree = None  # type: ignore[assignment]
+
+
+def _date(text: str) -> datetime:
+    """Convert a property list date the same way plistlib does, trailing fields are optional
+    :param text (str): date text, for example 2020-01-02T03:04:05Z"""
+    match = _DATE_RE.match(text)
+
+    if match is None:
+        raise ValueError(f"Invalid property list date {text!r}")
+
+    fields = list()
+
+    for value in match.groups():
+        if value is None:
+            break
+
+        fields.append(int(value))
+
+    # Only ever the leading year to second fields, missing month/day raises TypeError as in plistlib
+    return datetime(*fields)  # type: ignore[arg-type]
+
+
+def _scalar(tag: str, text: Optional[str]) -> Any:
+    """Convert a property list scalar element into the native type plistlib would return
+    :param tag (str): element tag
+    :param text (str): element text"""
+    text = text or ""
+
+    if tag == "string":
+        return text
+    elif tag == "integer":
+        # plistlib also accepts hexadecimal integers
+        return int(text, 16) if text.startswith(("0x", "0X")) else int(text)
+    elif tag == "real":
+        return float(text)
+    elif tag == "true":
+        return True
+    elif tag == "false":
+        return False
+    elif tag == "data":
+        return b64decode(text)
+    elif tag == "date":
+        return _date(text)
+
+    raise ValueError(f"Unsupported property list element {tag!r}")
+
+
+def _load_plist_lxml(fp: BinaryIO) -> Any:
+    """Read an XML property list in a single streaming pass, clearing elements once converted
+    :param fp (file): property list file object opened in binary mode"""
+    result: Any = None
+    containers: List[Any] = list()  # Open dict/array values
+    keys: List[Optional[str]] = list()  # Most recent key for each open dict
+    events = etree.iterparse(fp, events=("start", "end"), remove_comments=True, resolve_entities=False, no_network=True)
+
+    for event, elem in events:
+        tag = elem.tag
+
+        if event == "start":
+            if tag == "dict":
+                containers.append(dict())
+                keys.append(None)
+            elif tag == "array":
+                containers.append(list())
+
+            continue
+
+        if tag == "plist" or not isinstance(tag, str):
+            continue
+        elif tag == "key":
+            keys[-1] = elem.text or ""
+            elem.clear()
+            continue
+        elif tag == "dict":
+            value = containers.pop()
+            keys.pop()
+        elif tag == "array":
+            value = containers.pop()
+        else:
+            value = _scalar(tag, elem.text)
+
+        elem.clear()
+
+        if not containers:
+            result = value
+        elif isinstance(containers[-1], dict):
+            containers[-1][keys[-1]] = value
+        else:
+            containers[-1].append(value)
+
+    return result
+
+
+@contextmanager
+def _mapped(fp: BinaryIO) -> Iterator[BinaryIO]:
+    """Memory map a property list file so it is read without copying it into a bytes object,
+    anything that can't be mapped (empty files, in memory streams) is read into a buffer instead
+    :param fp (file): property list file object opened in binary mode"""
+    try:
+        mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        yield BytesIO(fp.read())
+        return
+
+    try:
+        yield mm  # type: ignore[misc]
+    finally:
+        mm.close()
+
+
+def _is_binary(stream: BinaryIO) -> bool:
+    """Test if a property list stream is a binary property list, rewinding the stream afterwards
+    :param stream (file): property list stream"""
+    header = stream.read(6)
+    stream.seek(0)
+
+    return header == b"bplist"
+
+
+def _load_stream(stream: BinaryIO) -> Any:
+    """Read a property list from a binary stream
+    :param stream (file): property list stream"""
+    # Binary property lists are not XML, so leave those to plistlib
+    if etree is None or _is_binary(stream):
+        return plistlib.load(stream)
+
+    return _load_plist_lxml(stream)
+
+
+def loads(s: bytes) -> Any:
+    """Read a property list from bytes
+    :param s (bytes): property list byte string"""
+    return _load_stream(BytesIO(s))
+
+
+def load(fp: BinaryIO) -> Any:
+    """Read a property list from a file object opened in binary mode
+    :param fp (file): property list file object"""
+    with _mapped(fp) as stream:
+        return _load_stream(stream)
+
+
+def load_key(fp: BinaryIO, key: str, default: Any = None) -> Any:
+    """Read a single top level value from a property list file, stopping as soon as it is found
+    :param fp (file): property list file object opened in binary mode
+    :param key (str): top level dictionary key to return the value of
+    :param default (Any): value returned when the key is not present"""
+    with _mapped(fp) as stream:
+        if etree is None or _is_binary(stream):
+            return plistlib.load(stream).get(key, default)
+
+        return _find_key(stream, key, default)
+
+
+def _find_key(stream: BinaryIO, key: str, default: Any) -> Any:
+    """Stream an XML property list for a single top level value, see load_key
+    :param stream (file): property list stream
+    :param key (str): top level dictionary key to return the value of
+    :param default (Any): value returned when the key is not present"""
+    depth = 0  # A depth of 1 is the top level dictionary
+    found = False
+    events = etree.iterparse(stream, events=("start", "end"), remove_comments=True, resolve_entities=False, no_network=True)
+
+    for event, elem in events:
+        tag = elem.tag
+
+        if tag in ("dict", "array"):
+            if event == "start":
+                if found:
+                    break  # Container values are left to the full loader
+
+                depth += 1
+            else:
+                depth -= 1
+
+            continue
+
+        if event == "start" or tag == "plist":
+            continue
+
+        if depth == 1:
+            if found:
+                return _scalar(tag, elem.text)
+
+            found = tag == "key" and elem.text == key
+
+        elem.clear()
+    else:
+        return default
+
+    stream.seek(0)
+
+    return _load_plist_lxml(stream).get(key, default)
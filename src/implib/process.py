@@ -0,0 +1,26 @@
+"""Shared handling for the external tools run with subprocess"""
+import subprocess
+
+from typing import Union
+
+
+def decode_output(output: Union[str, bytes, None]) -> str:
+    """Decode subprocess output, output captured with an encoding is already a string
+    :param output (str, bytes): captured output"""
+    if isinstance(output, bytes):
+        return output.decode("utf-8", "replace")
+
+    return output or ""
+
+
+class ProcessException(Exception):
+    """External tool exited with an error, subclasses set the tool name used in the message
+    :param p (subprocess.CompletedProcess): subprocess"""
+    tool = "process"
+
+    def __init__(self, p: subprocess.CompletedProcess) -> None:
+        self.exit_code = p.returncode
+        self.stdout = decode_output(p.stdout).strip()
+        self.stderr = decode_output(p.stderr).strip()
+        self.message = f"{self.tool} exited with exit code {self.exit_code}: {self.stdout or self.stderr}"
+        super().__init__(self.message)
@@ -1,42 +1,75 @@
 """XML to Native dict conversion"""
-from collections import defaultdict
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 from xml.etree import ElementTree
 
+try:
+    from lxml import etree  # type: ignore[import-untyped, import-not-found]
+except ImportError:
+    etree = None  # type: ignore[assignment]
+
 
 def read_xml(f: Path) -> ElementTree.Element:
-    """Read an XML file and return the root"""
-    with open(f, "r") as xml_file:
-        return ElementTree.XML(xml_file.read())
+    """Read an XML file and return the root, parsed with lxml when it is available"""
+    if etree is not None:
+        parser = etree.XMLParser(remove_blank_text=True, remove_comments=True, remove_pis=True,
+                                 resolve_entities=False, no_network=True)
+        return etree.parse(str(f), parser=parser).getroot()
+
+    # Parsing from the file lets expat decode the document itself and read it in chunks
+    return ElementTree.parse(str(f)).getroot()
+
 
+def _add_child(children: Dict[Any, Any], tag: Any, value: Any) -> None:
+    """Add a converted child value, repeated tags are collected into a list in document order
+    :param children (dict): converted children of the parent element
+    :param tag (Any): child element tag
+    :param value (Any): converted child value, never a list itself"""
+    if tag not in children:
+        children[tag] = value
+    elif isinstance(children[tag], list):
+        children[tag].append(value)
+    else:
+        children[tag] = [children[tag], value]
+
+
+def convert_xml_iter(f: Path) -> Dict[Any, Any]:
+    """Convert an XML file to native Dict in a single streaming pass, without building the full element
+    tree or recursing; the output follows https://stackoverflow.com/a/32842402
+    :param f (Path): XML file to convert"""
+    if etree is not None:
+        events = etree.iterparse(str(f), events=("start", "end"), resolve_entities=False, no_network=True)
+    else:
+        events = ElementTree.iterparse(str(f), events=("start", "end"))
 
-def convert_xml(root: ElementTree.Element) -> Dict[Any, Any]:
-    """Convert XML to native Dict based on https://stackoverflow.com/a/32842402
-    :param root (ElementTree.Element): XML object to convert"""
     result: Dict[Any, Any] = dict()
-    result.update({root.tag: {} if root.attrib else None})
-    children = list(root)
+    stack: List[Dict[Any, Any]] = list()  # Children values collected for each open element
 
-    if children:
-        dd = defaultdict(list)
+    for event, elem in events:
+        if event == "start":
+            stack.append(dict())
+            continue
 
-        for dc in map(convert_xml, children):
-            for k, v in dc.items():
-                dd[k].append(v)
+        dd = stack.pop()
+        value: Any = dd if dd else {} if elem.attrib else None
 
-        result = {root.tag: {k: v[0] if len(v) == 1 else v for k, v in dd.items()}}
+        if elem.attrib:
+            value.update((k, v) for k, v in elem.attrib.items())
 
-    if root.attrib:
-        result[root.tag].update((k, v) for k, v in root.attrib.items())
+        if elem.text:
+            text = elem.text.strip()
 
-    if root.text:
-        text = root.text.strip()
+            if dd or elem.attrib:
+                if text:
+                    value["text"] = text
+            else:
+                value = text
 
-        if children or root.attrib:
-            if text:
-                result[root.tag]["text"] = text
+        if stack:
+            _add_child(stack[-1], elem.tag, value)
         else:
-            result[root.tag] = text
+            result = {elem.tag: value}
+
+        elem.clear()  # Release the element's children/text as soon as it has been converted
 
     return result
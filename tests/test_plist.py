@@ -0,0 +1,104 @@
+"""Check implib.plist reads property lists the same way plistlib does"""
+import plistlib
+import sys
+import unittest
+
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.joinpath("src")))
+
+from implib import plist  # noqa: E402
+
+
+SCALARS = {"string": "Adobe Photoshop",
+           "empty_string": "",
+           "integer": 42,
+           "negative_integer": -3,
+           "real": 1.5,
+           "true": True,
+           "false": False,
+           "data": b"\x00\x01binary",
+           "date": datetime(2020, 1, 2, 3, 4, 5)}
+
+NESTED = {"receipts": [{"packageid": "com.adobe.acrobat", "optional": True},
+                       {"packageid": "com.adobe.other", "installed_size": 1024}],
+          "LSMinimumSystemVersion": "10.15",
+          "nested": {"array": [1, [2, {"empty": {}}], []], "dict": {"key": "value"}}}
+
+# Forms plistlib accepts that plistlib.dumps never writes
+XML_ONLY = {"hex_integer": b"<integer>0x10</integer>",
+            "upper_hex_integer": b"<integer>0XfF</integer>",
+            "date_without_seconds": b"<date>2020-01-02T03:04Z</date>",
+            "date_only": b"<date>2020-01-02Z</date>"}
+
+
+def xml_plist(value: bytes) -> bytes:
+    """Wrap a single XML property list value in a plist document"""
+    return (b'<?xml version="1.0" encoding="UTF-8"?>\n<plist version="1.0">\n<!-- comment -->\n'
+            + value + b"\n</plist>\n")
+
+
+class PlistEquivalenceTest(unittest.TestCase):
+    def assert_loads_same(self, data: bytes) -> None:
+        self.assertEqual(plist.loads(data), plistlib.loads(data))
+
+    def assert_load_same(self, data: bytes) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            plist_file = Path(tmp_dir).joinpath("test.plist")
+            plist_file.write_bytes(data)
+
+            with open(plist_file, "rb") as f:
+                self.assertEqual(plist.load(f), plistlib.loads(data))
+
+            for key in plistlib.loads(data):
+                with open(plist_file, "rb") as f:
+                    self.assertEqual(plist.load_key(f, key), plistlib.loads(data)[key], key)
+
+    def test_scalars(self):
+        for fmt in (plistlib.FMT_XML, plistlib.FMT_BINARY):
+            for key, value in SCALARS.items():
+                with self.subTest(fmt=fmt, key=key):
+                    self.assert_loads_same(plistlib.dumps({key: value}, fmt=fmt))
+                    self.assert_loads_same(plistlib.dumps([value], fmt=fmt))
+
+    def test_nested_containers(self):
+        for fmt in (plistlib.FMT_XML, plistlib.FMT_BINARY):
+            with self.subTest(fmt=fmt):
+                self.assert_loads_same(plistlib.dumps(NESTED, fmt=fmt))
+                self.assert_load_same(plistlib.dumps(NESTED, fmt=fmt))
+
+    def test_xml_only_forms(self):
+        for key, value in XML_ONLY.items():
+            with self.subTest(key=key):
+                self.assert_loads_same(xml_plist(value))
+                self.assert_loads_same(xml_plist(b"<dict><key>k</key>" + value + b"</dict>"))
+
+    def test_load_key_ignores_nested_keys(self):
+        data = plistlib.dumps({"a": {"target": "nested"}, "b": [{"target": "in array"}], "target": "top"})
+
+        with TemporaryDirectory() as tmp_dir:
+            plist_file = Path(tmp_dir).joinpath("test.plist")
+            plist_file.write_bytes(data)
+
+            with open(plist_file, "rb") as f:
+                self.assertEqual(plist.load_key(f, "target"), "top")
+
+            with open(plist_file, "rb") as f:
+                self.assertEqual(plist.load_key(f, "missing", "default"), "default")
+
+
+@unittest.skipIf(plist.etree is None, "lxml is not installed, plistlib is already used")
+class PlistlibFallbackTest(PlistEquivalenceTest):
+    """Run the same checks with lxml disabled so the plistlib fallback is covered too"""
+    def setUp(self):
+        self.etree = plist.etree
+        plist.etree = None
+
+    def tearDown(self):
+        plist.etree = self.etree
+
+
+if __name__ == "__main__":
+    unittest.main()